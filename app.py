@@ -0,0 +1,894 @@
+"""IELTS mock-test platform.
+
+Single-file Flask app: students register, take timed listening/reading
+mock tests and get an estimated band score; admins manage tests and
+review results.
+"""
+
+import json
+import mimetypes
+import os
+import posixpath
+import queue
+import re
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from functools import lru_cache
+
+from flask import (
+    Flask,
+    abort,
+    flash,
+    g,
+    has_request_context,
+    jsonify,
+    redirect,
+    render_template,
+    request,
+    send_from_directory,
+    session,
+    url_for,
+)
+from flask_login import (
+    LoginManager,
+    current_user,
+    login_required,
+    login_user,
+    logout_user,
+)
+from werkzeug.security import check_password_hash, generate_password_hash
+
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj).decode()
+
+    _json_loads = orjson.loads
+except ImportError:  # pragma: no cover - fallback when orjson is absent
+    def _json_dumps(obj):
+        return json.dumps(obj, ensure_ascii=False)
+
+    _json_loads = json.loads
+
+try:
+    from argon2 import PasswordHasher
+    from argon2.exceptions import Argon2Error, InvalidHashError
+
+    # OWASP low-latency profile: much cheaper per login than werkzeug's
+    # 600k-iteration pbkdf2 default at equivalent security.
+    _argon2 = PasswordHasher(time_cost=2, memory_cost=19456, parallelism=1)
+except ImportError:  # pragma: no cover - fallback when argon2-cffi is absent
+    _argon2 = None
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+
+def _fast_slug(s):
+    """Slugify ``s``, handling the common all-ASCII case inline.
+
+    python-slugify (with unidecode's transliteration tables) is only
+    imported for non-ASCII titles, keeping it off the startup path.
+    """
+    if s.isascii():
+        return _SLUG_RE.sub("-", s.lower()).strip("-")
+    try:
+        from slugify import slugify
+    except ImportError:  # pragma: no cover - best effort without the package
+        import unicodedata
+
+        s = unicodedata.normalize("NFKD", s).encode("ascii", "ignore").decode()
+        return _SLUG_RE.sub("-", s.lower()).strip("-")
+    return slugify(s)
+
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+DB_PATH = os.path.join(DATA_DIR, "ielts.db")
+AUDIO_DIR = os.path.join(DATA_DIR, "audio")
+
+app = Flask(__name__)
+app.config["SECRET_KEY"] = os.environ.get("SECRET_KEY", "dev-secret-change-me")
+# Behind a front server that understands X-Sendfile, set USE_X_SENDFILE=1
+# so Werkzeug hands audio streaming to it. For nginx, instead set
+# AUDIO_ACCEL_PREFIX to an internal location (e.g. /_protected_audio)
+# aliased to data/audio/ and nginx serves the file via sendfile(2).
+app.config["USE_X_SENDFILE"] = os.environ.get("USE_X_SENDFILE") == "1"
+AUDIO_ACCEL_PREFIX = os.environ.get("AUDIO_ACCEL_PREFIX")
+
+login_manager = LoginManager(app)
+login_manager.login_view = "login"
+
+# Connection pragmas: WAL keeps readers unblocked during writes and
+# synchronous=NORMAL drops the per-commit fsync, which dominates latency
+# on the answer-autosave path.
+_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=134217728;
+PRAGMA cache_size=-20000;
+PRAGMA foreign_keys=ON;
+"""
+
+# Ratio thresholds and the band awarded at or above each. The band is a
+# pure function of raw_score/total_questions, so it lives in the schema
+# as a generated column; the CASE ladder is built from these tuples.
+_THRESHOLDS = (0.45, 0.50, 0.55, 0.60, 0.65, 0.70, 0.75, 0.85, 0.90, 0.95)
+_BANDS = (4.0, 4.5, 5.0, 5.5, 6.0, 6.5, 7.0, 7.5, 8.0, 8.5, 9.0)
+
+_BAND_CASE_SQL = (
+    "CASE WHEN raw_score IS NULL THEN NULL"
+    " WHEN total_questions IS NULL OR total_questions = 0 THEN 0.0 "
+    + " ".join(
+        "WHEN raw_score*1.0/total_questions >= %s THEN %s" % (t, b)
+        for t, b in zip(reversed(_THRESHOLDS), reversed(_BANDS[1:]))
+    )
+    + " ELSE %s END" % _BANDS[0]
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    full_name TEXT NOT NULL,
+    email TEXT NOT NULL UNIQUE,
+    password_hash TEXT NOT NULL,
+    role TEXT NOT NULL DEFAULT 'student',
+    center_id INTEGER,
+    token_version INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS tests (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    slug TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    section TEXT NOT NULL DEFAULT 'listening',
+    duration_minutes INTEGER NOT NULL DEFAULT 30,
+    audio_filename TEXT
+);
+CREATE TABLE IF NOT EXISTS questions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    test_id INTEGER NOT NULL REFERENCES tests(id),
+    qtype TEXT NOT NULL DEFAULT 'mcq',
+    prompt TEXT NOT NULL,
+    options_json TEXT NOT NULL DEFAULT '[]',
+    answer_key TEXT NOT NULL DEFAULT '',
+    order_index INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL REFERENCES users(id),
+    test_id INTEGER NOT NULL REFERENCES tests(id),
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    raw_score INTEGER,
+    total_questions INTEGER,
+    band_score REAL GENERATED ALWAYS AS ({band_case}) STORED
+);
+CREATE TABLE IF NOT EXISTS answers (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    submission_id INTEGER NOT NULL REFERENCES submissions(id),
+    question_id INTEGER NOT NULL REFERENCES questions(id),
+    response TEXT NOT NULL DEFAULT '',
+    is_correct INTEGER NOT NULL DEFAULT 0
+);
+
+-- users.email and tests.slug get implicit indexes from UNIQUE; the hot
+-- answers/questions lookups need explicit ones.
+DROP INDEX IF EXISTS idx_answers_sub_q; -- superseded by the unique index
+CREATE UNIQUE INDEX IF NOT EXISTS uq_answers_sub_q ON answers(submission_id, question_id);
+CREATE INDEX IF NOT EXISTS idx_answers_sub_correct ON answers(submission_id, is_correct);
+CREATE INDEX IF NOT EXISTS idx_questions_test_order ON questions(test_id, order_index);
+CREATE INDEX IF NOT EXISTS idx_submissions_user ON submissions(user_id);
+CREATE INDEX IF NOT EXISTS idx_submissions_started ON submissions(started_at DESC);
+
+CREATE VIEW IF NOT EXISTS test_qcount AS
+    SELECT test_id, COUNT(*) AS c FROM questions GROUP BY test_id;
+""".format(band_case=_BAND_CASE_SQL)
+
+
+# ---------------------------------------------------------------------------
+# Database helpers
+# ---------------------------------------------------------------------------
+
+def _connect():
+    # cached_statements keeps prepared statements around so hot queries
+    # skip re-parse/re-plan; identical SQL text is the cache key, which
+    # is why the hot statements below are module constants.
+    db = sqlite3.connect(
+        DB_PATH,
+        isolation_level=None,
+        check_same_thread=False,
+        cached_statements=256,
+    )
+    db.row_factory = sqlite3.Row
+    db.executescript(_PRAGMAS)
+    return db
+
+
+# Statements executed on every answer save / authenticated request.
+SQL_SELECT_USER_BY_ID = "SELECT * FROM users WHERE id = ?"
+SQL_SELECT_SUBMISSION = "SELECT * FROM submissions WHERE id = ?"
+SQL_UPSERT_ANSWER = (
+    "INSERT INTO answers (submission_id, question_id, response, is_correct)"
+    " VALUES (?,?,?,?)"
+    " ON CONFLICT(submission_id, question_id)"
+    " DO UPDATE SET response = excluded.response,"
+    " is_correct = excluded.is_correct"
+)
+
+
+# With WAL, any number of readers can run alongside the single writer.
+# Reads borrow a connection from a small pool instead of paying a
+# connect/close per request; writes share one long-lived connection
+# serialized by a lock (SQLite allows only one writer anyway). The lock
+# is held from first get_db() until request teardown.
+_READER_POOL_SIZE = 8
+_reader_pool = queue.Queue(maxsize=_READER_POOL_SIZE)
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_db():
+    if "db" not in g:
+        if has_request_context() and request.method in ("GET", "HEAD"):
+            try:
+                g.db = _reader_pool.get_nowait()
+            except queue.Empty:
+                g.db = _connect()
+            g.db_is_reader = True
+        else:
+            global _writer
+            _writer_lock.acquire()
+            try:
+                if _writer is None:
+                    _writer = _connect()
+            except BaseException:
+                # close_db only releases the lock once g.db is set; if
+                # the connect fails we must release it here or every
+                # later write request deadlocks.
+                _writer_lock.release()
+                raise
+            g.db = _writer
+            g.db_is_reader = False
+    return g.db
+
+
+@app.teardown_appcontext
+def close_db(exc):
+    db = g.pop("db", None)
+    if db is None:
+        return
+    if g.pop("db_is_reader", False):
+        try:
+            _reader_pool.put_nowait(db)
+        except queue.Full:
+            db.close()
+    else:
+        _writer_lock.release()
+
+
+def init_db():
+    os.makedirs(DATA_DIR, exist_ok=True)
+    os.makedirs(AUDIO_DIR, exist_ok=True)
+    db = get_db()
+    db.executescript(SCHEMA)
+    # best-effort column additions for databases created before them
+    for stmt in (
+        "ALTER TABLE submissions ADD COLUMN total_questions INTEGER",
+        "ALTER TABLE users ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0",
+    ):
+        try:
+            db.execute(stmt)
+        except sqlite3.OperationalError:
+            pass
+    db.commit()
+
+
+@lru_cache(maxsize=256)
+def _test_meta(test_id):
+    """Per-test grading data: (total, {question_id: (qtype, answer_key)}).
+
+    Tests change only on admin import/create, which clear this cache, so
+    the hot answer path never has to re-read question rows.
+    """
+    rows = get_db().execute(
+        "SELECT id, qtype, answer_key FROM questions WHERE test_id = ?",
+        (test_id,),
+    ).fetchall()
+    return len(rows), {
+        r["id"]: (r["qtype"], (r["answer_key"] or "").strip().lower())
+        for r in rows
+    }
+
+
+def now_iso():
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+# ---------------------------------------------------------------------------
+# Auth
+# ---------------------------------------------------------------------------
+
+def hash_password(password):
+    if _argon2 is not None:
+        return _argon2.hash(password)
+    return generate_password_hash(password)
+
+
+def verify_password(stored, password):
+    """Check ``password`` against ``stored``; return (ok, needs_rehash).
+
+    Argon2 hashes are verified directly; anything else is treated as a
+    legacy werkzeug hash and flagged for re-hashing on success.
+    """
+    if stored.startswith("$argon2"):
+        if _argon2 is None:
+            return False, False
+        try:
+            _argon2.verify(stored, password)
+        except (Argon2Error, InvalidHashError):
+            return False, False
+        return True, _argon2.check_needs_rehash(stored)
+    ok = check_password_hash(stored, password)
+    return ok, ok and _argon2 is not None
+
+
+class User:
+    """Flask-Login user. Implements the user protocol directly rather
+    than via UserMixin so __slots__ actually takes effect: load_user runs
+    on every request, and slotted instances skip __dict__ creation."""
+
+    __slots__ = ("id", "full_name", "email", "role", "center_id")
+
+    is_authenticated = True
+    is_active = True
+    is_anonymous = False
+
+    def __init__(self, row):
+        # row may be a sqlite3.Row or a plain dict from the user cache.
+        self.id = row["id"]
+        self.full_name = row["full_name"]
+        self.email = row["email"]
+        self.role = row["role"]
+        self.center_id = row["center_id"]
+
+    def get_id(self):
+        return str(self.id)
+
+
+# Cross-request cache of user rows as plain dicts (sqlite3.Row objects
+# are bound to their connection). Flask-Login calls load_user on every
+# authenticated request, so this saves one SELECT per request. Entries
+# are popped on login/logout; a dict beats lru_cache here because it
+# supports per-key invalidation.
+_USER_CACHE_MAX = 1024
+_user_cache = {}
+
+
+def _invalidate_user(user_id):
+    _user_cache.pop(int(user_id), None)
+
+
+def _session_payload(data):
+    """User fields carried in the signed session cookie; "tv" mirrors
+    users.token_version. Bumping the column and dropping the cached row
+    (_invalidate_user) revokes issued cookies."""
+    return {
+        "id": data["id"],
+        "full_name": data["full_name"],
+        "email": data["email"],
+        "role": data["role"],
+        "center_id": data["center_id"],
+        "tv": data["token_version"],
+    }
+
+
+@login_manager.user_loader
+def load_user(user_id):
+    user = getattr(g, "_current_user_obj", None)
+    if user is not None and str(user.id) == str(user_id):
+        return user
+    user_id = int(user_id)
+
+    # Fast path: the signed cookie already carries the user fields, but
+    # it is only trusted against the cached row's token_version. A cache
+    # miss falls through to the DB load (one SELECT per user per
+    # process), after which the comparison is live; a mismatch discards
+    # the cookie and reloads.
+    payload = session.get("u") if has_request_context() else None
+    if payload is not None and payload.get("id") == user_id:
+        cached = _user_cache.get(user_id)
+        if cached is not None:
+            if cached["token_version"] == payload.get("tv"):
+                user = User(payload)
+                g._current_user_obj = user
+                return user
+            session.pop("u", None)
+
+    data = _user_cache.get(user_id)
+    if data is None:
+        row = get_db().execute(SQL_SELECT_USER_BY_ID, (user_id,)).fetchone()
+        if row is None:
+            return None
+        if len(_user_cache) >= _USER_CACHE_MAX:
+            _user_cache.clear()
+        data = dict(row)
+        _user_cache[user_id] = data
+    if has_request_context():
+        session["u"] = _session_payload(data)
+    user = User(data)
+    g._current_user_obj = user
+    return user
+
+
+def admin_required(view):
+    from functools import wraps
+
+    @wraps(view)
+    def wrapped(*args, **kwargs):
+        if not current_user.is_authenticated or current_user.role != "admin":
+            abort(403)
+        return view(*args, **kwargs)
+
+    return wrapped
+
+
+@app.route("/register", methods=["GET", "POST"])
+def register():
+    if request.method == "POST":
+        full_name = request.form.get("full_name", "").strip()
+        email = request.form.get("email", "").strip().lower()
+        password = request.form.get("password", "")
+        if not full_name or not email or not password:
+            flash("All fields are required.")
+            return render_template("register.html")
+        db = get_db()
+        try:
+            db.execute(
+                "INSERT INTO users (full_name, email, password_hash) VALUES (?,?,?)",
+                (full_name, email, hash_password(password)),
+            )
+            db.commit()
+        except sqlite3.IntegrityError:
+            flash("That email is already registered.")
+            return render_template("register.html")
+        flash("Account created, please log in.")
+        return redirect(url_for("login"))
+    return render_template("register.html")
+
+
+@app.route("/login", methods=["GET", "POST"])
+def login():
+    if request.method == "POST":
+        email = request.form.get("email", "").strip().lower()
+        password = request.form.get("password", "")
+        db = get_db()
+        row = db.execute(
+            "SELECT * FROM users WHERE email = ?", (email,)
+        ).fetchone()
+        if row is None:
+            ok = False
+        else:
+            ok, needs_rehash = verify_password(row["password_hash"], password)
+        if not ok:
+            flash("Invalid email or password.")
+            return render_template("login.html")
+        if needs_rehash:
+            db.execute(
+                "UPDATE users SET password_hash = ? WHERE id = ?",
+                (hash_password(password), row["id"]),
+            )
+            db.commit()
+        _invalidate_user(row["id"])
+        login_user(User(row))
+        session["u"] = _session_payload(row)
+        return redirect(url_for("test_select"))
+    return render_template("login.html")
+
+
+@app.route("/logout")
+@login_required
+def logout():
+    _invalidate_user(current_user.id)
+    logout_user()
+    session.pop("u", None)
+    return redirect(url_for("login"))
+
+
+# ---------------------------------------------------------------------------
+# Test taking
+# ---------------------------------------------------------------------------
+
+@app.route("/")
+def index():
+    return redirect(url_for("test_select"))
+
+
+@app.route("/tests")
+@login_required
+def test_select():
+    tests = get_db().execute(
+        "SELECT * FROM tests ORDER BY section, title"
+    ).fetchall()
+    return render_template("test_select.html", tests=tests)
+
+
+@app.route("/tests/<slug>/start", methods=["POST"])
+@login_required
+def test_start(slug):
+    db = get_db()
+    test = db.execute("SELECT * FROM tests WHERE slug = ?", (slug,)).fetchone()
+    if test is None:
+        abort(404)
+    cur = db.execute(
+        "INSERT INTO submissions (user_id, test_id, started_at, total_questions)"
+        " VALUES (?,?,?,(SELECT COUNT(*) FROM questions WHERE test_id = ?))",
+        (current_user.id, test["id"], now_iso(), test["id"]),
+    )
+    sub_id = cur.lastrowid
+    db.commit()
+    return redirect(url_for("test_take", slug=slug, submission_id=sub_id))
+
+
+@app.route("/tests/<slug>/take/<int:submission_id>")
+@login_required
+def test_take(slug, submission_id):
+    # One statement for test + submission + questions instead of three;
+    # LEFT JOIN so a test without questions still renders.
+    rows = get_db().execute(
+        "SELECT t.slug, t.title, t.section, t.duration_minutes, t.audio_filename,"
+        " s.id, s.user_id, s.finished_at,"
+        " q.id AS qid, q.qtype, q.prompt, q.options_json"
+        " FROM tests t JOIN submissions s ON s.test_id = t.id"
+        " LEFT JOIN questions q ON q.test_id = t.id"
+        " WHERE t.slug = ? AND s.id = ?"
+        " ORDER BY q.order_index",
+        (slug, submission_id),
+    ).fetchall()
+    if not rows or rows[0]["user_id"] != current_user.id:
+        abort(404)
+    head = rows[0]
+    if head["finished_at"]:
+        return redirect(url_for("results_view", submission_id=submission_id))
+    questions = [
+        {
+            "id": r["qid"],
+            "qtype": r["qtype"],
+            "prompt": r["prompt"],
+            "options_json": r["options_json"],
+        }
+        for r in rows
+        if r["qid"] is not None
+    ]
+    return render_template(
+        "test_take.html", test=head, submission=head, questions=questions
+    )
+
+
+@app.route("/api/answer", methods=["POST"])
+@login_required
+def api_answer():
+    data = request.get_json(silent=True) or {}
+    try:
+        submission_id = int(data["submission_id"])
+        question_id = int(data["question_id"])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"ok": False, "error": "bad request"}), 400
+    response = str(data.get("response", ""))
+
+    db = get_db()
+    sub = db.execute(SQL_SELECT_SUBMISSION, (submission_id,)).fetchone()
+    if sub is None or sub["user_id"] != current_user.id or sub["finished_at"]:
+        return jsonify({"ok": False, "error": "not found"}), 404
+    _, questions = _test_meta(sub["test_id"])
+    meta = questions.get(question_id)
+    if meta is None:
+        return jsonify({"ok": False, "error": "not found"}), 404
+
+    correct = int(response.strip().lower() == meta[1])
+    db.execute(
+        SQL_UPSERT_ANSWER,
+        (submission_id, question_id, response, correct),
+    )
+    db.commit()
+    return jsonify({"ok": True})
+
+
+@app.route("/api/answers", methods=["POST"])
+@login_required
+def api_answers():
+    """Batched variant of api_answer: saves many answers in one commit."""
+    data = request.get_json(silent=True) or {}
+    items = data.get("answers")
+    try:
+        submission_id = int(data["submission_id"])
+    except (KeyError, TypeError, ValueError):
+        return jsonify({"ok": False, "error": "bad request"}), 400
+    if not isinstance(items, list):
+        return jsonify({"ok": False, "error": "bad request"}), 400
+
+    db = get_db()
+    sub = db.execute(SQL_SELECT_SUBMISSION, (submission_id,)).fetchone()
+    if sub is None or sub["user_id"] != current_user.id or sub["finished_at"]:
+        return jsonify({"ok": False, "error": "not found"}), 404
+    _, questions = _test_meta(sub["test_id"])
+
+    rows = []
+    for item in items:
+        try:
+            question_id = int(item["question_id"])
+        except (KeyError, TypeError, ValueError):
+            return jsonify({"ok": False, "error": "bad request"}), 400
+        meta = questions.get(question_id)
+        if meta is None:
+            return jsonify({"ok": False, "error": "not found"}), 404
+        response = str(item.get("response", ""))
+        rows.append(
+            (
+                submission_id,
+                question_id,
+                response,
+                int(response.strip().lower() == meta[1]),
+            )
+        )
+    if rows:
+        db.execute("BEGIN")
+        db.executemany(
+            SQL_UPSERT_ANSWER,
+            rows,
+        )
+        db.commit()
+    return jsonify({"ok": True, "saved": len(rows)})
+
+
+@app.route("/tests/<slug>/finish/<int:submission_id>", methods=["POST"])
+@login_required
+def test_finish(slug, submission_id):
+    db = get_db()
+    sub = db.execute(SQL_SELECT_SUBMISSION, (submission_id,)).fetchone()
+    if sub is None or sub["user_id"] != current_user.id:
+        abort(404)
+    if not sub["finished_at"]:
+        # band_score is a generated column, so one UPDATE finishes the
+        # attempt: SQLite counts the correct answers and derives the band.
+        db.execute(
+            "UPDATE submissions SET raw_score = (SELECT COUNT(*) FROM answers"
+            " WHERE submission_id = ? AND is_correct = 1), finished_at = ?"
+            " WHERE id = ?",
+            (submission_id, now_iso(), submission_id),
+        )
+        db.commit()
+    return redirect(url_for("results_view", submission_id=submission_id))
+
+
+@app.route("/results/<int:submission_id>")
+@login_required
+def results_view(submission_id):
+    db = get_db()
+    sub = db.execute(
+        "SELECT s.*, t.title, t.section FROM submissions s"
+        " JOIN tests t ON t.id = s.test_id WHERE s.id = ?",
+        (submission_id,),
+    ).fetchone()
+    if sub is None or (
+        sub["user_id"] != current_user.id and current_user.role != "admin"
+    ):
+        abort(404)
+    return render_template(
+        "results.html", submission=sub, total=sub["total_questions"] or 0
+    )
+
+
+@app.route("/audio/<path:filename>")
+@login_required
+def serve_audio(filename):
+    if AUDIO_ACCEL_PREFIX:
+        if os.path.isabs(filename) or ".." in filename.split("/"):
+            abort(404)
+        # Auth ran above; nginx streams the file so the worker is free
+        # for API traffic instead of pumping a multi-MB MP3 through Python.
+        resp = app.response_class(status=200)
+        resp.headers["X-Accel-Redirect"] = posixpath.join(
+            AUDIO_ACCEL_PREFIX, filename
+        )
+        resp.headers["Content-Type"] = (
+            mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        )
+        return resp
+    return send_from_directory(AUDIO_DIR, filename)
+
+
+# ---------------------------------------------------------------------------
+# Admin
+# ---------------------------------------------------------------------------
+
+RESULTS_PAGE_SIZE = 50
+
+
+@app.route("/admin/results")
+@admin_required
+def admin_results():
+    # Keyset pagination on started_at: ?before=<cursor> fetches the next
+    # page without OFFSET scans, and the grouped test_qcount view avoids
+    # a correlated COUNT(*) per submission.
+    before = request.args.get("before")
+    sql = (
+        "SELECT s.id, s.started_at, s.finished_at, s.raw_score, s.band_score,"
+        " u.full_name, t.title, COALESCE(tq.c, 0) AS total_q"
+        " FROM submissions s"
+        " JOIN users u ON u.id = s.user_id"
+        " JOIN tests t ON t.id = s.test_id"
+        " LEFT JOIN test_qcount tq ON tq.test_id = t.id"
+    )
+    params = []
+    if before:
+        sql += " WHERE s.started_at < ?"
+        params.append(before)
+    sql += " ORDER BY s.started_at DESC LIMIT ?"
+    params.append(RESULTS_PAGE_SIZE)
+    rows = get_db().execute(sql, params).fetchall()
+    next_before = (
+        rows[-1]["started_at"] if len(rows) == RESULTS_PAGE_SIZE else None
+    )
+    return render_template("admin_results.html", rows=rows, next_before=next_before)
+
+
+@app.route("/admin/tests")
+@admin_required
+def admin_tests():
+    tests = get_db().execute(
+        "SELECT t.*, (SELECT COUNT(*) FROM questions WHERE test_id = t.id) AS qcount"
+        " FROM tests t ORDER BY t.section, t.title"
+    ).fetchall()
+    return render_template("admin_tests.html", tests=tests)
+
+
+@app.route("/admin/tests/create", methods=["POST"])
+@admin_required
+def admin_tests_create():
+    title = request.form.get("title", "").strip()
+    if not title:
+        flash("Title is required.")
+        return redirect(url_for("admin_tests"))
+    db = get_db()
+    try:
+        db.execute(
+            "INSERT INTO tests (slug, title, section, duration_minutes, audio_filename)"
+            " VALUES (?,?,?,?,?)",
+            (
+                _fast_slug(title),
+                title,
+                request.form.get("section", "listening"),
+                int(request.form.get("duration_minutes", 30)),
+                request.form.get("audio_filename") or None,
+            ),
+        )
+        db.commit()
+        _test_meta.cache_clear()
+    except sqlite3.IntegrityError:
+        flash("A test with that title already exists.")
+    return redirect(url_for("admin_tests"))
+
+
+@app.route("/admin/tests/<int:test_id>/import", methods=["POST"])
+@admin_required
+def admin_tests_import(test_id):
+    db = get_db()
+    test = db.execute("SELECT id FROM tests WHERE id = ?", (test_id,)).fetchone()
+    if test is None:
+        abort(404)
+    file = request.files.get("questions")
+    if file is None:
+        flash("No file uploaded.")
+        return redirect(url_for("admin_tests"))
+    try:
+        data = _json_loads(file.read())
+    except ValueError:
+        flash("Invalid JSON file.")
+        return redirect(url_for("admin_tests"))
+    rows = [
+        (
+            test_id,
+            item.get("qtype", "mcq"),
+            item.get("prompt", ""),
+            _json_dumps(item.get("options", [])),
+            item.get("answer_key", ""),
+            int(item.get("order", 0)),
+        )
+        for item in data
+    ]
+    # One transaction for the whole import: a single fsync instead of
+    # one per question.
+    db.execute("BEGIN")
+    db.executemany(
+        "INSERT INTO questions (test_id, qtype, prompt, options_json,"
+        " answer_key, order_index) VALUES (?,?,?,?,?,?)",
+        rows,
+    )
+    db.commit()
+    _test_meta.cache_clear()
+    flash("Imported %d questions." % len(data))
+    return redirect(url_for("admin_tests"))
+
+
+# ---------------------------------------------------------------------------
+# Template filters
+# ---------------------------------------------------------------------------
+
+# options_json strings never change between renders, so rendering a
+# 40-question test re-parses the same 40 strings on every page load;
+# memoizing by the string itself skips the redundant decodes.
+@app.template_filter("loadjson")
+@lru_cache(maxsize=2048)
+def loadjson_filter(s):
+    try:
+        return _json_loads(s)
+    except (TypeError, ValueError):
+        return []
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+@app.cli.command("init-db")
+def init_db_cmd():
+    """Create database tables."""
+    init_db()
+    print("Initialized %s" % DB_PATH)
+
+
+@app.cli.command("seed")
+def seed_cmd():
+    """Seed an admin, a student and one sample test."""
+    init_db()
+    db = get_db()
+    user_rows = [
+        (full_name, email, hash_password(password), role)
+        for full_name, email, password, role in [
+            ("Admin", "admin@example.com", "admin123", "admin"),
+            ("Student", "student@example.com", "student123", "student"),
+        ]
+        if not db.execute(
+            "SELECT id FROM users WHERE email = ?", (email,)
+        ).fetchone()
+    ]
+    db.execute("BEGIN")
+    db.executemany(
+        "INSERT INTO users (full_name, email, password_hash, role)"
+        " VALUES (?,?,?,?)",
+        user_rows,
+    )
+    db.commit()
+
+    if db.execute(
+        "SELECT id FROM tests WHERE slug = ?", ("listening-sample-1",)
+    ).fetchone():
+        print("Already seeded.")
+        return
+    test_id = db.execute(
+        "INSERT INTO tests (slug, title, section, duration_minutes) VALUES (?,?,?,?)",
+        ("listening-sample-1", "Listening Sample 1", "listening", 30),
+    ).lastrowid
+    samples = [
+        ("mcq", "The lecture is mainly about ...", ["climate", "housing", "travel"], "climate"),
+        ("gap", "The speaker moved to London in ____.", [], "1998"),
+        ("mcq", "The library opens at ...", ["8am", "9am", "10am"], "9am"),
+        ("gap", "The tour costs ____ pounds.", [], "15"),
+    ]
+    db.execute("BEGIN")
+    db.executemany(
+        "INSERT INTO questions (test_id, qtype, prompt, options_json,"
+        " answer_key, order_index) VALUES (?,?,?,?,?,?)",
+        [
+            (test_id, qtype, prompt, _json_dumps(options), key, i)
+            for i, (qtype, prompt, options, key) in enumerate(samples)
+        ],
+    )
+    db.commit()
+    print("Seeded sample data.")
+
+
+if __name__ == "__main__":
+    app.run(debug=True)
@@ -0,0 +1,21 @@
+"""Production WSGI entrypoint.
+
+The workload is almost entirely I/O (SQLite + template rendering), so a
+single gevent worker with many greenlets goes much further than the
+threaded dev server:
+
+    gunicorn -k gevent -w 1 --worker-connections 1000 wsgi:app
+
+monkey.patch_all() must run before ``app`` (and therefore sqlite3/Flask)
+is imported. Connections stay per-greenlet because get_db() keys them on
+``flask.g``.
+"""
+
+from gevent import monkey
+
+monkey.patch_all()
+
+from app import app  # noqa: E402
+
+if __name__ == "__main__":
+    app.run()